@@ -8,21 +8,23 @@ tls_path = os.path.join(data_dir, 'SUB1-SUB2 115 kV -XcelUpdate.xlsx')
 
 print("--- SUB1.csv Columns ---")
 try:
-    df_sub1 = pd.read_csv(sub1_path)
+    # nrows=0 parses only the header row
+    df_sub1 = pd.read_csv(sub1_path, nrows=0)
     print(df_sub1.columns.tolist())
 except Exception as e:
     print(e)
 
 print("\n--- SUB2.csv Columns ---")
 try:
-    df_sub2 = pd.read_csv(sub2_path)
+    df_sub2 = pd.read_csv(sub2_path, nrows=0)
     print(df_sub2.columns.tolist())
 except Exception as e:
     print(e)
 
 print("\n--- CAISO Update Sheet Columns ---")
 try:
-    df_tls = pd.read_excel(tls_path, sheet_name='CAISO Update', engine='openpyxl')
+    # pandas opens the workbook read-only and stops after the header row
+    df_tls = pd.read_excel(tls_path, sheet_name='CAISO Update', engine='openpyxl', nrows=0)
     print(df_tls.columns.tolist())
 except Exception as e:
     print(e)
@@ -5,8 +5,12 @@ and generates validation reports.
 """
 
 import pandas as pd
+import numpy as np
 import openpyxl
+import argparse
 import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # File paths
@@ -18,12 +22,21 @@ SUB1_FILE = DATASETS_DIR / "SUB1.csv"
 SUB2_FILE = DATASETS_DIR / "SUB2.csv"
 TLS_FILE = DATASETS_DIR / "SUB1-SUB2 115 kV -XcelUpdate.xlsx"
 
+# Cached copy of the parsed TLS sheet, reused while it is newer than TLS_FILE.
+# Bump TLS_CACHE_VERSION whenever read_tls_sheet changes what it returns, so
+# caches written by older code are not served.
+TLS_CACHE_VERSION = 3
+TLS_CACHE_FILE = TLS_FILE.with_suffix(f'.v{TLS_CACHE_VERSION}.pkl')
+
 # Output files
 MERGED_FILE = OUTPUT_DIR / "SUB1-SUB2 115kV.csv"
 HIGHLIGHTED_FILE = OUTPUT_DIR / "SUB1-SUB2 115kV_highlighted.csv"
 UPDATED_FILE = OUTPUT_DIR / "SUB1-SUB2 115kV_updated.csv"
 SUMMARY_FILE = OUTPUT_DIR / "SUB1-SUB2 115kV_summary_report.csv"
 
+# Supported output formats; CSV is the deliverable, Parquet is opt-in
+OUTPUT_FORMATS = ['csv', 'parquet']
+
 # Column mapping: CSV column -> Excel column (source of truth naming)
 # The Excel file is the source of truth, so we rename CSV columns to match Excel naming
 COLUMN_RENAME_MAP = {
@@ -47,17 +60,89 @@ EXCEL_ONLY_COLUMNS = [
     'Type of Change',  # Will be populated during update
 ]
 
+# Key columns used to match merged components against TLS rows
+MATCH_KEY_COLUMNS = ['OID', 'Station Name', 'Component Description', 'Additional Information']
+
+
+def dedupe_column_names(columns):
+    """
+    Name columns as pandas' default (C) CSV parser does; the pyarrow engine
+    leaves blank and repeated headers as-is. Blank headers become
+    'Unnamed: <position>' and repeats get the first free .1, .2, ... suffix
+    not already used in the header (AMP Rating.1 etc.).
+    """
+    names = [col if col != '' else f"Unnamed: {pos}" for pos, col in enumerate(columns)]
+
+    # Named columns keep their names before unnamed ones are suffixed
+    unnamed = [pos for pos, col in enumerate(columns) if col == '']
+    named = [pos for pos in range(len(names)) if pos not in unnamed]
+
+    counts = {}
+    for pos in named + unnamed:
+        col = names[pos]
+        count = counts.get(col, 0)
+        name = col
+        while count > 0:
+            counts[col] = count + 1
+            name = f"{col}.{count}"
+            count = count + 1 if name in names else counts.get(name, 0)
+        names[pos] = name
+        counts[name] = count + 1
+
+    return names
+
+
+def read_csv_file(path):
+    """Read a substation CSV file with the multithreaded pyarrow parser."""
+    df = pd.read_csv(path, engine='pyarrow')
+    # The rating blocks repeat their headers (Rating Type, AMP Rating, ...)
+    df.columns = dedupe_column_names(df.columns)
+    # pyarrow fills empty text cells with None where the default parser uses NaN
+    return df.replace({None: np.nan})
+
+
+def read_tls_sheet():
+    """Read the CAISO Update sheet which contains the component data."""
+    # pandas' openpyxl reader already opens the workbook read-only; going
+    # through read_excel keeps its NA handling and numeric inference.
+    # All columns are kept; find_differences compares whichever ones the
+    # merged data shares with the sheet.
+    return pd.read_excel(TLS_FILE, sheet_name='CAISO Update', engine='openpyxl')
+
+
+def read_tls_file():
+    """Read the CAISO Update sheet, reusing TLS_CACHE_FILE while it is up to date."""
+    if TLS_CACHE_FILE.exists() and TLS_CACHE_FILE.stat().st_mtime >= TLS_FILE.stat().st_mtime:
+        # Skip parsing the workbook when the cached sheet is up to date
+        return pd.read_pickle(TLS_CACHE_FILE)
+
+    # Read the CAISO Update sheet which contains the component data
+    tls_df = read_tls_sheet()
+
+    # Caching is best-effort; a read-only Datasets directory must not fail the run
+    try:
+        tls_df.to_pickle(TLS_CACHE_FILE)
+    except OSError as e:
+        print(f"  - Could not cache TLS data ({e}); continuing without cache")
+
+    return tls_df
+
 
 def load_csv_files():
     """Load SUB1 and SUB2 CSV files."""
     print("Loading CSV files...")
 
     try:
-        sub1_df = pd.read_csv(SUB1_FILE)
-        print(f"  - Loaded SUB1.csv: {len(sub1_df)} rows")
+        # The two files are independent, so read them concurrently
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            sub1_future = executor.submit(read_csv_file, SUB1_FILE)
+            sub2_future = executor.submit(read_csv_file, SUB2_FILE)
 
-        sub2_df = pd.read_csv(SUB2_FILE)
-        print(f"  - Loaded SUB2.csv: {len(sub2_df)} rows")
+            sub1_df = sub1_future.result()
+            print(f"  - Loaded SUB1.csv: {len(sub1_df)} rows")
+
+            sub2_df = sub2_future.result()
+            print(f"  - Loaded SUB2.csv: {len(sub2_df)} rows")
 
         return sub1_df, sub2_df
     except Exception as e:
@@ -65,13 +150,16 @@ def load_csv_files():
         raise
 
 
-def load_tls_file():
-    """Load TLS Excel file."""
+def load_tls_file(tls_future=None):
+    """
+    Load TLS Excel file.
+    If tls_future is given, wait for that background read_tls_file call
+    instead of reading the file here.
+    """
     print("Loading TLS Excel file...")
 
     try:
-        # Read the CAISO Update sheet which contains the component data
-        tls_df = pd.read_excel(TLS_FILE, sheet_name='CAISO Update', engine='openpyxl')
+        tls_df = tls_future.result() if tls_future is not None else read_tls_file()
         print(f"  - Loaded TLS file: {len(tls_df)} rows")
         print(f"  - Columns: {list(tls_df.columns)[:10]}...")  # Show first 10 columns
         return tls_df
@@ -84,12 +172,14 @@ def merge_csv_files(sub1_df, sub2_df):
     """Merge SUB1 and SUB2 dataframes and standardize to Excel column names."""
     print("\nMerging CSV files...")
 
-    # Concatenate dataframes
-    merged_df = pd.concat([sub1_df, sub2_df], ignore_index=True)
-    print(f"  - Combined rows: {len(merged_df)}")
+    initial_count = len(sub1_df) + len(sub2_df)
+    print(f"  - Combined rows: {initial_count}")
 
-    # Remove duplicates based on OID
-    initial_count = len(merged_df)
+    # Skip SUB2 rows whose OID is already in SUB1 so they are never concatenated
+    sub2_new = sub2_df[~sub2_df['OID'].isin(sub1_df['OID'])]
+    merged_df = pd.concat([sub1_df, sub2_new], ignore_index=True)
+
+    # Remove remaining duplicates based on OID (repeats within a single file)
     merged_df = merged_df.drop_duplicates(subset=['OID'], keep='first')
     duplicates_removed = initial_count - len(merged_df)
 
@@ -122,149 +212,129 @@ def merge_csv_files(sub1_df, sub2_df):
     return merged_df
 
 
-def match_component(row, tls_df):
+def align_tls_rows(merged_df, tls_df):
     """
-    Match a component from merged data with TLS data.
-    Returns matched TLS row or None.
+    Align TLS rows to merged_df's index with left merges on the match keys:
+    OID first, then Station Name + Component Description (+ Additional
+    Information when it matches). The first TLS occurrence of a key wins.
+    Returns (tls_aligned, matched) where tls_aligned holds the sheet rows of
+    the matched merged rows only, keeping the sheet's column dtypes.
     """
-    # Primary match: OID
-    if pd.notna(row['OID']):
-        oid_match = tls_df[tls_df['OID'] == row['OID']]
-        if not oid_match.empty:
-            return oid_match.iloc[0]
-
-    # Fallback match: Station Name + Component Description + Additional Info
-    station_match = tls_df[tls_df['Station Name'] == row['Station Name']]
-
-    if not station_match.empty:
-        desc_match = station_match[
-            station_match['Component Description'] == row['Component Description']
-        ]
-
-        if not desc_match.empty:
-            # Try to match Additional Info if present
-            if pd.notna(row['Additional Information']):
-                info_match = desc_match[
-                    desc_match['Additional Information'] == row['Additional Information']
-                ]
-                if not info_match.empty:
-                    return info_match.iloc[0]
-
-            # Return first description match if no Additional Info match
-            return desc_match.iloc[0]
-
-    return None
-
-
-def compare_rows(merged_row, tls_row):
+    tls = tls_df.reset_index(drop=True)
+    tls_pos = pd.Series(tls.index, index=tls.index, name='_tls_pos')
+    # Key dtypes differ between the CSVs and the sheet (e.g. an all-NaN float
+    # column against text), so both sides are merged as object
+    keys = merged_df[MATCH_KEY_COLUMNS].astype(object)
+
+    def lookup(on):
+        # First TLS occurrence of each fully populated key (NaN never matches)
+        candidates = tls[on].astype(object).join(tls_pos).dropna(subset=on).drop_duplicates(subset=on)
+        joined = keys[on].merge(candidates, on=on, how='left')
+        return pd.Series(joined['_tls_pos'].values, index=merged_df.index)
+
+    # Primary match: OID, then fall back to Station Name + Component Description,
+    # preferring rows that also match Additional Information
+    positions = (
+        lookup(['OID'])
+        .fillna(lookup(['Station Name', 'Component Description', 'Additional Information']))
+        .fillna(lookup(['Station Name', 'Component Description']))
+    )
+
+    # Take only matched rows; reindexing with NaN positions would upcast
+    # integer sheet columns to float and show 115 against 115.0
+    matched = positions.notna()
+    tls_aligned = tls.iloc[positions[matched].astype(int)]
+    tls_aligned.index = merged_df.index[matched]
+
+    return tls_aligned, matched
+
+
+def find_differences(merged_df, tls_aligned):
     """
-    Compare two rows and return list of differences.
-    Returns list of tuples: (column_name, merged_value, tls_value)
-    Note: Columns have already been renamed to match Excel naming convention.
+    Compare the merged data with the aligned TLS rows, cell by cell.
+    Two NaNs are equal, a value against NaN (or a column missing from TLS)
+    differs, otherwise values are compared as stripped strings.
+    Returns a boolean DataFrame marking cells that differ from the TLS data.
     """
-    differences = []
-
-    # Compare all columns that exist in both rows
-    for col in merged_row.index:
-        if col in ['Mismatch']:  # Skip system columns (but not 'Type of Change' - we want to compare it)
-            continue
-
-        merged_val = merged_row[col]
-        tls_val = tls_row.get(col) if col in tls_row.index else None
-
-        # Handle NaN comparisons
-        merged_is_nan = pd.isna(merged_val)
-        tls_is_nan = pd.isna(tls_val)
-
-        if merged_is_nan and tls_is_nan:
-            continue
-        elif merged_is_nan or tls_is_nan:
-            differences.append((col, merged_val, tls_val))
-        elif str(merged_val).strip() != str(tls_val).strip():
-            differences.append((col, merged_val, tls_val))
+    # Skip system columns (but not 'Type of Change' - we want to compare it)
+    compared = merged_df.columns.drop('Mismatch', errors='ignore')
 
-    return differences
+    # Columns missing from TLS compare as NaN
+    merged_values = merged_df[compared].to_numpy(dtype=object)
+    tls_values = tls_aligned.reindex(columns=compared).to_numpy(dtype=object)
 
+    # Handle NaN comparisons
+    merged_is_nan = pd.isna(merged_values)
+    tls_is_nan = pd.isna(tls_values)
+    both_present = ~merged_is_nan & ~tls_is_nan
+    differences = merged_is_nan != tls_is_nan
 
-def add_mismatch_column(merged_df, tls_df):
-    """Add Mismatch column to identify discrepancies."""
-    print("\nCross-referencing with TLS file...")
+    # Stringify and strip each side once, only for the cells compared by value.
+    # This runs per column on object Series so strings stay variable-width; one
+    # fixed-width array across all columns would size every cell to the longest.
+    for col_pos in np.flatnonzero(both_present.any(axis=0)):
+        rows = both_present[:, col_pos]
+        merged_strings = pd.Series(merged_values[rows, col_pos]).astype(str).str.strip()
+        tls_strings = pd.Series(tls_values[rows, col_pos]).astype(str).str.strip()
+        differences[rows, col_pos] = (merged_strings != tls_strings).to_numpy(dtype=bool)
 
-    merged_df['Mismatch'] = 'No'
-    mismatch_count = 0
-    not_in_tls_count = 0
+    diff_mask = pd.DataFrame(False, index=merged_df.index, columns=merged_df.columns)
+    diff_mask[compared] = differences
 
-    for idx, row in merged_df.iterrows():
-        tls_match = match_component(row, tls_df)
-
-        if tls_match is None:
-            # Component not found in TLS
-            not_in_tls_count += 1
-            continue
-
-        # Compare rows
-        differences = compare_rows(row, tls_match)
-
-        if differences:
-            merged_df.at[idx, 'Mismatch'] = 'Yes'
-            mismatch_count += 1
-
-    print(f"  - Components with mismatches: {mismatch_count}")
-    print(f"  - Components not in TLS: {not_in_tls_count}")
-    print(f"  - Components matching: {len(merged_df) - mismatch_count - not_in_tls_count}")
-
-    return merged_df
+    return diff_mask
 
 
 def update_with_tls_data(merged_df, tls_df):
-    """Update all entries with TLS data (source of truth) and track changes."""
+    """
+    Update all entries with TLS data (source of truth) and track changes.
+    Marks Mismatch and Type of Change in the same pass over the data.
+    """
     print("\nUpdating with TLS data (source of truth)...")
 
     # Initialize Type of Change if not already present
     if 'Type of Change' not in merged_df.columns:
         merged_df['Type of Change'] = ''
-
-    changes_log = []
-    update_count = 0
-    not_in_excel_count = 0
-
-    for idx, row in merged_df.iterrows():
-        tls_match = match_component(row, tls_df)
-
-        if tls_match is None:
-            # Component not found in Excel - retain CSV data as-is
-            not_in_excel_count += 1
-            continue
-
-        # Find differences and update ALL fields from Excel (source of truth)
-        differences = compare_rows(row, tls_match)
-
-        if differences:
-            updated_columns = []
-
-            for col, old_val, new_val in differences:
-                # Update the value with Excel data
-                merged_df.at[idx, col] = new_val
-                updated_columns.append(col)
-
-                # Log the change
-                changes_log.append({
-                    'OID': row['OID'],
-                    'Column(s) updated': col,
-                    'Old Value': old_val,
-                    'New Value': new_val
-                })
-
-            # Update Type of Change column
-            if updated_columns:
-                change_type = f"Updated: {', '.join(updated_columns)}"
-                merged_df.at[idx, 'Type of Change'] = change_type
-                # Mark as mismatch
-                merged_df.at[idx, 'Mismatch'] = 'Yes'
-                update_count += 1
+    if 'Mismatch' not in merged_df.columns:
+        merged_df['Mismatch'] = None
+
+    tls_aligned, matched = align_tls_rows(merged_df, tls_df)
+
+    # Components not found in Excel retain CSV data as-is, so only matched
+    # rows are compared
+    matched_df = merged_df.loc[matched]
+    diff_mask = find_differences(matched_df, tls_aligned)
+    has_differences = diff_mask.any(axis=1)
+
+    # Log every changed cell, row by row, before the values are overwritten
+    merged_values = matched_df.to_numpy(dtype=object)
+    tls_values = tls_aligned.reindex(columns=merged_df.columns).to_numpy(dtype=object)
+    row_pos, col_pos = np.nonzero(diff_mask.to_numpy())
+    changes_log = pd.DataFrame({
+        'OID': matched_df['OID'].to_numpy()[row_pos],
+        'Column(s) updated': merged_df.columns[col_pos],
+        'Old Value': merged_values[row_pos, col_pos],
+        'New Value': tls_values[row_pos, col_pos]
+    })
+
+    # Update ALL differing fields from Excel (source of truth), one column at a time
+    for col in diff_mask.columns[diff_mask.any()]:
+        rows = diff_mask.index[diff_mask[col]]
+        if col in tls_aligned.columns:
+            merged_df.loc[rows, col] = tls_aligned.loc[rows, col].to_numpy()
         else:
-            # No differences - data matches Excel
-            merged_df.at[idx, 'Mismatch'] = 'No'
+            merged_df.loc[rows, col] = None
+
+    # Update Type of Change column with the names of the updated columns
+    updated_columns = diff_mask.dot(diff_mask.columns + ', ').str[:-len(', ')]
+    merged_df.loc[has_differences.index[has_differences], 'Type of Change'] = (
+        'Updated: ' + updated_columns[has_differences]
+    )
+
+    # Mark mismatches; matched rows without differences match Excel
+    merged_df.loc[matched, 'Mismatch'] = np.where(has_differences, 'Yes', 'No')
+
+    update_count = int(has_differences.sum())
+    not_in_excel_count = int((~matched).sum())
 
     print(f"  - Updated {update_count} component(s) with Excel data")
     print(f"  - Components not in Excel (retained CSV data): {not_in_excel_count}")
@@ -277,19 +347,45 @@ def generate_summary_report(changes_log):
     """Generate summary report of all changes."""
     print("\nGenerating summary report...")
 
-    if changes_log:
-        summary_df = pd.DataFrame(changes_log)
+    # changes_log already has the report columns, even when it is empty
+    summary_df = changes_log
+
+    if not summary_df.empty:
         print(f"  - Summary report entries: {len(summary_df)}")
     else:
-        # Create empty dataframe with correct columns
-        summary_df = pd.DataFrame(columns=['OID', 'Column(s) updated', 'Old Value', 'New Value'])
         print("  - No changes to report")
 
     return summary_df
 
 
-def main():
+def write_output(df, path, output_format):
+    """Write an output file in the requested format and return the path written."""
+    if output_format == 'parquet':
+        path = path.with_suffix('.parquet')
+        # Parquet columns hold a single type, so text columns that also contain
+        # numbers (Component Description, Old/New Value, ...) are stored as strings
+        object_columns = {col: 'string' for col in df.columns if df[col].dtype == object}
+        df.astype(object_columns).to_parquet(path, compression='zstd', index=False)
+    else:
+        df.to_csv(path, index=False)
+
+    return path
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        '--format', choices=OUTPUT_FORMATS, default='csv', dest='output_format',
+        help="Output file format (default: csv)"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Main execution function."""
+    args = parse_args(argv)
+
     print("=" * 60)
     print("Substation Data Merge and Validation")
     print("=" * 60)
@@ -297,37 +393,41 @@ def main():
     # Create output directory if it doesn't exist
     OUTPUT_DIR.mkdir(exist_ok=True)
 
-    # Step 1: Load files
-    sub1_df, sub2_df = load_csv_files()
-    tls_df = load_tls_file()
+    # Step 1: Load files, parsing the workbook in the background while the
+    # CSV files load
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        tls_future = executor.submit(read_tls_file)
+        sub1_df, sub2_df = load_csv_files()
+        tls_df = load_tls_file(tls_future)
 
     # Step 2: Merge CSV files and standardize to Excel column names
     merged_df = merge_csv_files(sub1_df, sub2_df)
 
     # Save merged file (with standardized column names)
-    merged_df.to_csv(MERGED_FILE, index=False)
-    print(f"\n[OK] Saved: {MERGED_FILE.name}")
+    merged_path = write_output(merged_df, MERGED_FILE, args.output_format)
+    print(f"\n[OK] Saved: {merged_path.name}")
 
     # Step 3: Update with Excel data (source of truth) and identify mismatches
-    # This will populate Excel-only columns and mark mismatches
-    updated_df, changes_log = update_with_tls_data(merged_df.copy(), tls_df)
-
-    # Save highlighted file (with Mismatch column)
-    updated_df.to_csv(HIGHLIGHTED_FILE, index=False)
-    print(f"[OK] Saved: {HIGHLIGHTED_FILE.name}")
-
-    # The updated file is the same as highlighted (already contains Excel data)
+    # This will populate Excel-only columns and mark mismatches.
+    # The merged file is already on disk, so the frame is updated in place.
+    updated_df, changes_log = update_with_tls_data(merged_df, tls_df)
 
     # Save updated file
-    updated_df.to_csv(UPDATED_FILE, index=False)
-    print(f"[OK] Saved: {UPDATED_FILE.name}")
+    updated_path = write_output(updated_df, UPDATED_FILE, args.output_format)
+
+    # The highlighted file is the same as updated (already contains Excel data
+    # and the Mismatch column), so copy it instead of serializing it again
+    highlighted_path = HIGHLIGHTED_FILE.with_suffix(updated_path.suffix)
+    shutil.copyfile(updated_path, highlighted_path)
+    print(f"[OK] Saved: {highlighted_path.name}")
+    print(f"[OK] Saved: {updated_path.name}")
 
     # Step 5: Generate summary report
     summary_df = generate_summary_report(changes_log)
 
     # Save summary report
-    summary_df.to_csv(SUMMARY_FILE, index=False)
-    print(f"[OK] Saved: {SUMMARY_FILE.name}")
+    summary_path = write_output(summary_df, SUMMARY_FILE, args.output_format)
+    print(f"[OK] Saved: {summary_path.name}")
 
     print("\n" + "=" * 60)
     print("Processing complete! All files saved to 'Final' directory.")
@@ -4,6 +4,8 @@ Test script to verify column mapping is working correctly
 import pandas as pd
 from pathlib import Path
 
+from merge_substation_data import read_tls_file
+
 # File paths
 BASE_DIR = Path(__file__).parent
 DATASETS_DIR = BASE_DIR / "Datasets"
@@ -22,16 +24,17 @@ COLUMN_MAPPING = {
     'Tertiary KV': 'Tertiary kV',
 }
 
-# Load files
+# Load files. SUB1 only needs its first two rows; the TLS data comes from the
+# same loader (and cache) as the main script, so values match what it compares
 print("Loading files...")
-sub1_df = pd.read_csv(SUB1_FILE)
-tls_df = pd.read_excel(TLS_FILE, sheet_name='CAISO Update', engine='openpyxl')
+sub1_df = pd.read_csv(SUB1_FILE, nrows=2)
+tls_df = read_tls_file()
 
 # Find a matching row by OID
 test_oid = sub1_df.iloc[1]['OID']  # Get second row
 print(f"\nTesting with OID: {test_oid}")
 
-csv_row = sub1_df[sub1_df['OID'] == test_oid].iloc[0]
+csv_row = sub1_df.iloc[1]
 tls_row = tls_df[tls_df['OID'] == test_oid].iloc[0]
 
 print("\n" + "="*80)
@@ -0,0 +1,120 @@
+"""
+Check how the substation CSVs are read, and how the merged rows are matched
+against, compared with and updated from the TLS sheet.
+"""
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import merge_substation_data as msd
+
+
+def make_frame(columns):
+    """Frame with the match key and Type of Change columns the CSVs and sheet share."""
+    df = pd.DataFrame(columns)
+    for col in msd.MATCH_KEY_COLUMNS + ['Type of Change']:
+        if col not in df.columns:
+            df[col] = None
+    return df
+
+
+@pytest.mark.parametrize('header', [
+    'A,A.1,A',
+    'a,a,a.1,a',
+    'A,A.1,A.1,A',
+    'A,,B,',
+    ',,Unnamed: 0,a,a',
+])
+def test_dedupe_column_names_matches_default_parser(header):
+    csv_text = header + '\n' + ','.join('1' for _ in header.split(','))
+    pyarrow_columns = pd.read_csv(io.StringIO(csv_text), engine='pyarrow').columns
+
+    expected = pd.read_csv(io.StringIO(csv_text)).columns.tolist()
+    assert msd.dedupe_column_names(pyarrow_columns) == expected
+
+
+@pytest.mark.filterwarnings('error')
+@pytest.mark.parametrize('path', [msd.SUB1_FILE, msd.SUB2_FILE])
+def test_read_csv_file_matches_default_parser(path):
+    pd.testing.assert_frame_equal(msd.read_csv_file(path), pd.read_csv(path))
+
+
+def test_align_tls_rows_matches_keys_of_different_dtypes():
+    # All-NaN Additional Information (float64) and numeric Component
+    # Description in the CSVs; float OIDs and mixed text in the sheet
+    merged_df = make_frame({
+        'OID': [1, 7, 8],
+        'Station Name': ['ALPHA', 'BETA', 'GAMMA'],
+        'Component Description': [1011, 1012, 1013],
+        'Additional Information': [np.nan, np.nan, np.nan],
+    })
+    tls_df = pd.DataFrame({
+        'OID': [1.0, np.nan, 9.0],
+        'Station Name': ['ALPHA', 'BETA', 'GAMMA'],
+        'Component Description': [1011, 1012, 'BUS'],
+        'Additional Information': ['LINE', 'LINE', None],
+    })
+
+    tls_aligned, matched = msd.align_tls_rows(merged_df, tls_df)
+
+    assert matched.tolist() == [True, True, False]
+    assert tls_aligned['Station Name'].iloc[:2].tolist() == ['ALPHA', 'BETA']
+
+
+def test_find_differences_compares_nan_and_stripped_strings():
+    merged_df = pd.DataFrame({
+        'OID': [1, 2],
+        'High kV': [115, 230],
+        'Units': ['AMPS ', np.nan],
+        'Notes': [np.nan, np.nan],
+        'Mismatch': ['Yes', 'Yes'],
+    })
+    tls_aligned = pd.DataFrame({
+        'OID': [1.0, 2.0],
+        'High kV': pd.Series([115, 230.0], dtype=object),
+        'Units': ['AMPS', 'AMPS'],
+        'Mismatch': [None, None],
+    })
+
+    diff_mask = msd.find_differences(merged_df, tls_aligned)
+
+    # 230 against 230.0 differs as text; Notes is missing from TLS and both NaN
+    assert diff_mask.to_dict('list') == {
+        'OID': [True, True],
+        'High kV': [False, True],
+        'Units': [False, True],
+        'Notes': [False, False],
+        'Mismatch': [False, False],
+    }
+
+
+def test_update_with_tls_data_keeps_sheet_dtypes_with_unmatched_rows():
+    merged_df = make_frame({'OID': [1, 3], 'High kV': [115, 230]})
+    tls_df = make_frame({'OID': [1, 2], 'High kV': [115, 115]})
+
+    updated_df, changes_log = msd.update_with_tls_data(merged_df, tls_df)
+
+    # OID 3 is not in the sheet; reading it must not turn 115 into 115.0
+    assert changes_log.empty
+    assert updated_df['High kV'].tolist() == [115, 230]
+    assert updated_df['High kV'].dtype == np.int64
+    assert updated_df['Mismatch'].tolist() == ['No', None]
+
+
+def test_update_with_tls_data_logs_and_applies_sheet_values():
+    merged_df = make_frame({'OID': [1, 3], 'High kV': [115, 230]})
+    tls_df = make_frame({'OID': [1], 'High kV': [230]})
+
+    updated_df, changes_log = msd.update_with_tls_data(merged_df, tls_df)
+
+    assert changes_log.to_dict('list') == {
+        'OID': [1],
+        'Column(s) updated': ['High kV'],
+        'Old Value': [115],
+        'New Value': [230],
+    }
+    assert updated_df['High kV'].tolist() == [230, 230]
+    assert updated_df['Mismatch'].tolist() == ['Yes', None]
+    assert updated_df.loc[0, 'Type of Change'] == 'Updated: High kV'
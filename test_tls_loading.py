@@ -0,0 +1,61 @@
+"""
+Check that the TLS loader reuses its cache while it is current and re-reads
+the workbook once it changes.
+"""
+import os
+
+import openpyxl
+import pandas as pd
+
+import merge_substation_data as msd
+
+
+def write_tls_workbook(path, high_rating):
+    """Write a small CAISO Update sheet with one component row."""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = 'CAISO Update'
+    ws.append(['OID', 'Station Name', 'High Rating'])
+    ws.append([100, 'ALPHA', high_rating])
+    wb.save(path)
+
+
+def use_tls_workbook(tmp_path, monkeypatch, high_rating):
+    """Point the loader at a temporary workbook and cache file."""
+    tls_file = tmp_path / 'tls.xlsx'
+    write_tls_workbook(tls_file, high_rating)
+    monkeypatch.setattr(msd, 'TLS_FILE', tls_file)
+    monkeypatch.setattr(msd, 'TLS_CACHE_FILE', tmp_path / 'tls.pkl')
+    return tls_file
+
+
+def fail_read_tls_sheet():
+    raise AssertionError('workbook parsed although the cache is current')
+
+
+def test_tls_cache_file_name_carries_version():
+    assert msd.TLS_CACHE_FILE.parent == msd.TLS_FILE.parent
+    assert msd.TLS_CACHE_FILE.name.endswith(f'.v{msd.TLS_CACHE_VERSION}.pkl')
+
+
+def test_read_tls_file_reuses_cache(tmp_path, monkeypatch):
+    use_tls_workbook(tmp_path, monkeypatch, 2000)
+
+    first = msd.read_tls_file()
+    assert msd.TLS_CACHE_FILE.exists()
+
+    monkeypatch.setattr(msd, 'read_tls_sheet', fail_read_tls_sheet)
+    pd.testing.assert_frame_equal(msd.read_tls_file(), first)
+
+
+def test_read_tls_file_rereads_newer_workbook(tmp_path, monkeypatch):
+    tls_file = use_tls_workbook(tmp_path, monkeypatch, 2000)
+    msd.read_tls_file()
+
+    # Rewrite the workbook and make the cache older than it
+    write_tls_workbook(tls_file, 600)
+    stale_mtime = tls_file.stat().st_mtime - 10
+    os.utime(msd.TLS_CACHE_FILE, (stale_mtime, stale_mtime))
+
+    assert msd.read_tls_file()['High Rating'].tolist() == [600]
+    assert msd.TLS_CACHE_FILE.stat().st_mtime >= tls_file.stat().st_mtime